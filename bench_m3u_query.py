@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark de m3u_query
+Génère une playlist synthétique et mesure le chargement, les sélections
+et les modifications en masse de Playlist
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from m3u_query import Playlist
+
+
+GROUPS = ['TR: News', 'TR: Sport', 'FR: Cinema', 'DE| Sport', 'Misc']
+LOGOS = ['http://i.imgur.com/a.png', 'https://logos.example.org/x.png', '']
+
+
+def generate(path: Path, entries: int):
+    """Écrit une playlist de `entries` chaînes (1/3 sans tvg-id, autres uniques)"""
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#EXTM3U\n')
+        for i in range(entries):
+            group = rng.choice(GROUPS)
+            tvg_id = f'ch{i}.tr' if i % 3 else ''
+            f.write(f'#EXTINF:-1 group-title="{group}" tvg-id="{tvg_id}" '
+                    f'tvg-logo="{rng.choice(LOGOS)}" tvg-name="Chan {i}",{group[:2]}: Chan {i}\n')
+            f.write(f'http://stream/{i}\n')
+
+
+def timed(label: str, func):
+    """Exécute func et affiche sa durée"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    count = result if isinstance(result, int) else len(result)
+    print(f"  {label:<45} {count:>9}  {elapsed:6.3f}s")
+    return result
+
+
+def main():
+    """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de m3u_query.Playlist")
+    parser.add_argument("--entries", type=int, default=1_000_000,
+                        help="Nombre d'entrées de la playlist (défaut: 1000000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'bench.m3u'
+        print(f"📝 Génération de {args.entries} entrées...")
+        generate(path, args.entries)
+
+        playlist = timed("chargement", lambda: Playlist.load(path))
+
+        print("🔍 Sélections")
+        timed("select(group, tvg_id='')",
+              lambda: playlist.select(group='TR: News', tvg_id=''))
+        timed("select(group_prefix='TR:', logo_host)",
+              lambda: playlist.select(group_prefix='TR:', logo_host='i.imgur.com'))
+        timed("select(where=...)",
+              lambda: playlist.select(where=lambda attrs: attrs['tvg-logo'] == ''))
+
+        print("✏️  Modifications en masse")
+        every = playlist.select()
+        timed("set_attrs(70 %, tvg-id)",
+              lambda: playlist.set_attrs(every[:len(every) * 7 // 10], {'tvg-id': 'y'}))
+        timed("set_attrs(tous, tvg-id)", lambda: playlist.set_attrs(every, {'tvg-id': 'x'}))
+        timed("set_attrs(tous, group-title)",
+              lambda: playlist.set_attrs(every, {'group-title': 'Tout'}))
+        timed("set_attrs(tous, group-title) sans changement",
+              lambda: playlist.set_attrs(every, {'group-title': 'Tout'}))
+        timed("set_attrs(tous, tvg-logo)",
+              lambda: playlist.set_attrs(every, {'tvg-logo': 'http://y.org/a.png'}))
+        timed("set_attrs(pays FR, name)",
+              lambda: playlist.set_attrs(playlist.select(country='FR'), {'name': 'DE: x'}))
+        timed("move_groups_with_prefix", lambda: playlist.move_groups_with_prefix('T', 'Turkey'))
+        timed("lines()", playlist.lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,10 @@ import subprocess
 import tempfile
 
 
+# Code pays en préfixe du nom de chaîne (ex: 'TR: ATV' -> 'TR')
+COUNTRY_CODE_PATTERN = re.compile(r'^([A-Z]{2}):\s*')
+
+
 class IPTVOrgAPI:
     """Interface pour l'API iptv-org"""
 
@@ -74,7 +78,7 @@ class IPTVOrgAPI:
 
     def _extract_country_code(self, name: str) -> Optional[str]:
         """Extrait le code pays du nom (ex: 'TR: ATV' -> 'TR')"""
-        match = re.match(r'^([A-Z]{2}):\s*', name)
+        match = COUNTRY_CODE_PATTERN.match(name)
         return match.group(1) if match else None
 
     def _calculate_match_score(self, query: str, target: str,
@@ -119,7 +123,7 @@ class IPTVOrgAPI:
     def _clean_channel_name(self, name: str) -> str:
         """Nettoie le nom de la chaîne"""
         # Enlever le code pays (ex: "TR: ")
-        name = re.sub(r'^[A-Z]{2}:\s*', '', name)
+        name = COUNTRY_CODE_PATTERN.sub('', name)
         # Enlever les infos entre crochets
         name = re.sub(r'\[.*?\]', '', name)
         return name.strip()
@@ -221,6 +225,11 @@ class M3UEditor:
         r'(?:tvg-logo="([^"]*)")?\s*'
         r',(.+)$'
     )
+    # En-tête puis nom : les virgules entre guillemets ne séparent pas le nom
+    NAME_PATTERN = re.compile(r'^([^,"]*(?:"[^"]*"[^,"]*)*),(.*)$')
+    DURATION_PATTERN = re.compile(r'^#EXTINF:\s*(-?[\d.]+)?')
+    # Noms d'attributs ancrés : 'x-group-title' n'est pas 'group-title'
+    KNOWN_ATTRS_PATTERN = re.compile(r'\s*(?<![\w-])(group-title|tvg-id|tvg-logo)="([^"]*)"')
 
     def __init__(self, input_file: Path, output_file: Path):
         self.input_file = input_file
@@ -229,41 +238,52 @@ class M3UEditor:
         self.api = IPTVOrgAPI()
         self.logo_manager = LogoManager(Path(__file__).parent / "logos")
 
-    def parse_extinf(self, line: str) -> Optional[Dict]:
-        """Parse une ligne EXTINF et extrait les attributs"""
+    @staticmethod
+    def parse_extinf(line: str) -> Optional[Dict]:
+        """
+        Parse une ligne EXTINF et extrait les attributs
+        La durée et les autres attributs (tvg-name, catchup...) sont conservés
+        dans 'duration' et 'extra' pour être réécrits par build_extinf
+        """
         # Pattern plus flexible pour gérer différents ordres d'attributs
         attrs = {
             'group-title': '',
             'tvg-id': '',
             'tvg-logo': '',
-            'name': ''
+            'name': '',
+            'duration': '-1',
+            'extra': ''
         }
 
-        # Extraire le nom (après la dernière virgule)
-        if ',' in line:
+        # Extraire le nom (après la première virgule hors guillemets)
+        name_match = M3UEditor.NAME_PATTERN.match(line)
+        if name_match:
+            header, name = name_match.groups()
+        elif ',' in line:
+            # Guillemets non fermés : on se rabat sur la dernière virgule
             header, name = line.rsplit(',', 1)
-            attrs['name'] = name.strip()
         else:
             return None
+        attrs['name'] = name.strip()
 
-        # Extraire les attributs
-        group_match = re.search(r'group-title="([^"]*)"', header)
-        if group_match:
-            attrs['group-title'] = group_match.group(1)
-
-        id_match = re.search(r'tvg-id="([^"]*)"', header)
-        if id_match:
-            attrs['tvg-id'] = id_match.group(1)
+        # Extraire les attributs (en un seul passage ; reversed() pour que la
+        # première occurrence d'un attribut répété l'emporte)
+        attrs.update(reversed(M3UEditor.KNOWN_ATTRS_PATTERN.findall(header)))
 
-        logo_match = re.search(r'tvg-logo="([^"]*)"', header)
-        if logo_match:
-            attrs['tvg-logo'] = logo_match.group(1)
+        # Conserver la durée et les attributs non gérés
+        duration_match = M3UEditor.DURATION_PATTERN.match(header)
+        if duration_match:
+            if duration_match.group(1):
+                attrs['duration'] = duration_match.group(1)
+            header = header[duration_match.end():]
+        attrs['extra'] = M3UEditor.KNOWN_ATTRS_PATTERN.sub('', header).strip()
 
         return attrs
 
-    def build_extinf(self, attrs: Dict) -> str:
+    @staticmethod
+    def build_extinf(attrs: Dict) -> str:
         """Construit une ligne EXTINF à partir des attributs"""
-        parts = ['#EXTINF:-1']
+        parts = [f"#EXTINF:{attrs.get('duration', '-1')}"]
 
         if attrs['group-title']:
             parts.append(f'group-title="{attrs["group-title"]}"')
@@ -271,6 +291,8 @@ class M3UEditor:
             parts.append(f'tvg-id="{attrs["tvg-id"]}"')
         if attrs['tvg-logo']:
             parts.append(f'tvg-logo="{attrs["tvg-logo"]}"')
+        if attrs.get('extra'):
+            parts.append(attrs['extra'])
 
         return ' '.join(parts) + f',{attrs["name"]}'
 
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+M3U Query
+Recherche et modification en masse des entrées EXTINF d'un fichier M3U
+(sélection par groupe, tvg-id, pays, hébergeur de logo, renommage de groupes)
+"""
+
+import gc
+import re
+import sys
+import argparse
+import urllib.parse
+from collections import deque
+from itertools import filterfalse, repeat
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+from m3u_editor import COUNTRY_CODE_PATTERN, M3UEditor
+
+
+class Playlist:
+    """
+    Playlist M3U indexée en mémoire
+
+    Les entrées sont les dictionnaires produits par M3UEditor.parse_extinf.
+    Des index secondaires (valeur -> numéros d'entrées) sont maintenus sur le
+    groupe, le tvg-id, le code pays du nom et l'hébergeur du logo, ce qui
+    permet de sélectionner et modifier des milliers d'entrées sans reparcourir
+    le fichier.
+    Une valeur portée par une seule entrée est indexée par son numéro (int)
+    plutôt que par un ensemble : la plupart des tvg-id sont uniques.
+    """
+
+    INDEXES = ('group-title', 'tvg-id', 'country', 'logo-host')
+
+    # Index à mettre à jour lorsqu'un attribut est modifié
+    FIELD_INDEXES = {
+        'group-title': ('group-title',),
+        'tvg-id': ('tvg-id',),
+        'tvg-logo': ('logo-host',),
+        'name': ('country',),
+    }
+
+    def __init__(self):
+        self.header: List[str] = []
+        self.entries: List[Dict] = []
+        self.raw_lines: List[str] = []
+        self.bodies: List[List[str]] = []
+        self.line_nums: List[int] = []
+        self.dirty: Set[int] = set()
+        self._index: Dict[str, Dict[str, Union[int, Set[int]]]] = {
+            name: {} for name in self.INDEXES
+        }
+        self._logo_hosts: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> 'Playlist':
+        """Charge un fichier M3U et construit les index"""
+        playlist = cls()
+        # Le chargement ne crée que des objets vivants : le ramasse-miettes
+        # ne ferait que reparcourir des millions de dictionnaires
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, 1):
+                    stripped = line.strip()
+                    attrs = None
+                    if stripped.startswith('#EXTINF:'):
+                        attrs = M3UEditor.parse_extinf(stripped)
+
+                    if attrs is not None:
+                        playlist._add(attrs, line, line_num)
+                    elif playlist.bodies:
+                        playlist.bodies[-1].append(line)
+                    else:
+                        playlist.header.append(line)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return playlist
+
+    def _add(self, attrs: Dict, raw_line: str, line_num: int):
+        """Ajoute une entrée et l'enregistre dans les index"""
+        idx = len(self.entries)
+        self.entries.append(attrs)
+        self.raw_lines.append(raw_line)
+        self.bodies.append([])
+        self.line_nums.append(line_num)
+
+        # Équivalent à _key / _index_add, déroulé : appelé une fois par entrée au chargement
+        country_match = COUNTRY_CODE_PATTERN.match(attrs['name'])
+        logo_host = self._logo_hosts.get(attrs['tvg-logo'])
+        if logo_host is None:
+            logo_host = self._logo_host(attrs['tvg-logo'])
+        keys = (attrs['group-title'], attrs['tvg-id'],
+                country_match.group(1) if country_match else '', logo_host)
+        index = self._index
+        for name, key in zip(self.INDEXES, keys):
+            buckets = index[name]
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = idx
+            elif isinstance(bucket, int):
+                buckets[key] = {bucket, idx}
+            else:
+                bucket.add(idx)
+
+    def _keys_of(self, name: str, ids: Iterable[int]) -> List[str]:
+        """Clés d'index de plusieurs entrées (dans l'ordre de `ids`)"""
+        entries = self.entries
+        if name in self.FIELD_INDEXES:
+            return [entries[i][name] for i in ids]
+        return [self._key(entries[i], name) for i in ids]
+
+    @staticmethod
+    def _ids(bucket: Union[int, Set[int]]) -> Set[int]:
+        """Numéros d'entrées d'une clé d'index (à ne pas modifier)"""
+        return {bucket} if isinstance(bucket, int) else bucket
+
+    @staticmethod
+    def _index_add(buckets: Dict, key: str, idx: int):
+        """Ajoute une entrée sous une clé d'index"""
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = idx
+        elif isinstance(bucket, int):
+            buckets[key] = {bucket, idx}
+        else:
+            bucket.add(idx)
+
+    @staticmethod
+    def _index_update(buckets: Dict, key: str, ids: Set[int]):
+        """Ajoute plusieurs entrées sous une clé d'index"""
+        if not ids:
+            return
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = set(ids)
+        elif isinstance(bucket, int):
+            buckets[key] = ids | {bucket}
+        else:
+            bucket |= ids
+
+    def _logo_host(self, logo: str) -> str:
+        """Extrait l'hébergeur d'une URL de logo (avec cache, les logos se répètent souvent)"""
+        host = self._logo_hosts.get(logo)
+        if host is None:
+            host = (urllib.parse.urlsplit(logo).hostname or '') if '://' in logo else ''
+            self._logo_hosts[logo] = host
+        return host
+
+    def _key(self, attrs: Dict, name: str) -> str:
+        """Calcule la clé d'une entrée pour un index"""
+        if name == 'country':
+            match = COUNTRY_CODE_PATTERN.match(attrs['name'])
+            return match.group(1) if match else ''
+        if name == 'logo-host':
+            return self._logo_host(attrs['tvg-logo'])
+        return attrs[name]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def values(self, index: str) -> Dict[str, int]:
+        """Retourne les valeurs d'un index avec leur nombre d'entrées"""
+        return {key: 1 if isinstance(bucket, int) else len(bucket)
+                for key, bucket in self._index[index].items()}
+
+    def select(self, group: Optional[str] = None,
+               group_prefix: Optional[str] = None,
+               tvg_id: Optional[str] = None,
+               country: Optional[str] = None,
+               logo_host: Optional[str] = None,
+               where: Optional[Callable[[Dict], bool]] = None) -> List[int]:
+        """
+        Sélectionne des entrées
+        Les critères indexés sont combinés (ET), puis le prédicat `where`
+        est appliqué aux entrées restantes.
+        Un tvg_id vide ('') sélectionne les entrées sans tvg-id.
+        Retourne les numéros d'entrées dans l'ordre du fichier
+        """
+        candidates: List[Set[int]] = []
+        for name, key in (('group-title', group), ('tvg-id', tvg_id),
+                          ('country', country), ('logo-host', logo_host)):
+            if key is not None:
+                candidates.append(self._ids(self._index[name].get(key, set())))
+
+        if group_prefix is not None:
+            matched: Set[int] = set()
+            for key, bucket in self._index['group-title'].items():
+                if key.startswith(group_prefix):
+                    matched |= self._ids(bucket)
+            candidates.append(matched)
+
+        if candidates:
+            # Intersection en partant du plus petit ensemble
+            candidates.sort(key=len)
+            selected = set(candidates[0])
+            for ids in candidates[1:]:
+                selected &= ids
+            result = sorted(selected)
+        else:
+            result = list(range(len(self.entries)))
+
+        if where is not None:
+            entries = self.entries
+            result = [i for i in result if where(entries[i])]
+
+        return result
+
+    def set_attrs(self, ids: Iterable[int], changes: Dict[str, str]) -> int:
+        """
+        Modifie les attributs des entrées sélectionnées
+        Retourne le nombre d'entrées effectivement modifiées
+        """
+        self.check_changes(changes)
+
+        # Chaque index ne dépend que d'un attribut : les nouvelles clés sont
+        # identiques pour toutes les entrées modifiées
+        new_attrs = dict.fromkeys(self.FIELD_INDEXES, '')
+        new_attrs.update(changes)
+        new_keys = {name: self._key(new_attrs, name)
+                    for field in changes for name in self.FIELD_INDEXES[field]}
+
+        # Entrées ayant déjà les valeurs demandées : les index restreignent les
+        # candidates, seuls les attributs dérivés (logo, nom) sont comparés
+        selected = set(ids)
+        unchanged = selected
+        for name, new_key in new_keys.items():
+            unchanged = unchanged & self._ids(self._index[name].get(new_key, set()))
+        entries = self.entries
+        for field, value in changes.items():
+            if unchanged and field not in self._index:
+                unchanged = {i for i in unchanged if entries[i][field] == value}
+        modified = selected - unchanged if unchanged else selected
+        if not modified:
+            return 0
+
+        for name in new_keys:
+            self._discard(name, modified)
+        # Boucle en C (deque vide) : environ deux fois plus rapide qu'un for
+        deque(map(dict.update, map(entries.__getitem__, modified), repeat(changes)), maxlen=0)
+        for name, new_key in new_keys.items():
+            self._index_update(self._index[name], new_key, modified)
+
+        self.dirty |= modified
+        return len(modified)
+
+    @classmethod
+    def check_changes(cls, changes: Dict[str, str]):
+        """Vérifie que les valeurs peuvent être écrites dans une ligne EXTINF"""
+        unknown = set(changes) - set(cls.FIELD_INDEXES)
+        if unknown:
+            raise ValueError(f"Attribut(s) inconnu(s): {', '.join(sorted(unknown))}")
+
+        for field, value in changes.items():
+            if '\n' in value or '\r' in value:
+                raise ValueError(f"Retour à la ligne interdit dans {field}")
+            if field != 'name' and '"' in value:
+                raise ValueError(f'Guillemet (") interdit dans {field}: {value}')
+
+    def _discard(self, name: str, ids: Set[int]):
+        """
+        Retire des entrées de leurs clés actuelles dans un index
+        La stratégie la moins coûteuse est choisie selon le nombre de clés,
+        d'entrées retirées et d'entrées restantes
+        """
+        buckets = self._index[name]
+        entries = self.entries
+        remaining = len(entries) - len(ids)
+
+        if remaining <= min(len(buckets), len(ids)):
+            # Presque toutes les entrées sont retirées : reconstruction de
+            # l'index à partir des entrées restantes (clés majoritairement
+            # uniques : dict() en C, puis regroupement des clés en double)
+            rest = list(filterfalse(ids.__contains__, range(len(entries))))
+            keys = self._keys_of(name, rest)
+            rebuilt: Dict[str, Union[int, Set[int]]] = dict(zip(keys, rest))
+            if len(rebuilt) < len(rest):
+                for i, key in zip(rest, keys):
+                    if rebuilt[key] != i:
+                        self._index_add(rebuilt, key, i)
+            self._index[name] = rebuilt
+        elif len(buckets) <= len(ids):
+            # Peu de clés : opérations ensemblistes clé par clé
+            for key in list(buckets):
+                bucket = buckets[key]
+                if isinstance(bucket, int):
+                    if bucket in ids:
+                        del buckets[key]
+                    continue
+                moved = bucket & ids
+                if len(moved) == len(bucket):
+                    del buckets[key]
+                elif moved:
+                    bucket -= moved
+        else:
+            # Beaucoup de clés (ex: tvg-id) : retrait entrée par entrée
+            for i, key in zip(ids, self._keys_of(name, ids)):
+                bucket = buckets[key]
+                if isinstance(bucket, int) or len(bucket) == 1:
+                    del buckets[key]
+                else:
+                    bucket.discard(i)
+
+    def move_group(self, old_group: str, new_group: str) -> int:
+        """
+        Renomme un groupe (déplace toutes ses entrées vers new_group)
+        Retourne le nombre d'entrées déplacées
+        """
+        self.check_changes({'group-title': new_group})
+        if old_group == new_group:
+            return 0
+        bucket = self._index['group-title'].pop(old_group, set())
+        ids = {bucket} if isinstance(bucket, int) else bucket
+        for i in ids:
+            self.entries[i]['group-title'] = new_group
+        self._index_update(self._index['group-title'], new_group, ids)
+        self.dirty |= ids
+        return len(ids)
+
+    def move_groups_with_prefix(self, prefix: str, new_group: str) -> int:
+        """Déplace toutes les entrées des groupes commençant par `prefix`"""
+        self.check_changes({'group-title': new_group})
+        groups = [key for key in self._index['group-title'] if key.startswith(prefix)]
+        return sum(self.move_group(group, new_group) for group in groups)
+
+    def lines(self) -> List[str]:
+        """
+        Reconstruit les lignes du fichier
+        Seules les entrées modifiées sont régénérées avec build_extinf,
+        les autres conservent leur ligne d'origine
+        """
+        output = list(self.header)
+        for i, attrs in enumerate(self.entries):
+            if i in self.dirty:
+                output.append(M3UEditor.build_extinf(attrs) + '\n')
+            else:
+                output.append(self.raw_lines[i])
+            output.extend(self.bodies[i])
+        return output
+
+    def save(self, path: Path):
+        """Écrit la playlist dans un fichier"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(self.lines())
+
+
+def parse_changes(assignments: List[str]) -> Dict[str, str]:
+    """Convertit une liste 'attribut=valeur' en dictionnaire"""
+    changes = {}
+    for assignment in assignments:
+        if '=' not in assignment:
+            raise ValueError(f"Format invalide (attendu attribut=valeur): {assignment}")
+        field, value = assignment.split('=', 1)
+        changes[field.strip()] = value
+    Playlist.check_changes(changes)
+    return changes
+
+
+def has_filter(args) -> bool:
+    """
+    Indique si au moins un filtre de sélection a été donné
+    Un --name ou --group-prefix vide sélectionne tout : ce n'est pas un filtre
+    """
+    return bool(args.no_tvg_id or args.group_prefix or args.name or any(
+        value is not None for value in (args.group, args.tvg_id, args.country, args.logo_host)
+    ))
+
+
+def non_negative_int(value: str) -> int:
+    """Type argparse : entier positif ou nul"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"valeur négative interdite: {value}")
+    return number
+
+
+def name_filter(args) -> Optional[Callable[[Dict], bool]]:
+    """Construit le prédicat --name (expression régulière sur le nom)"""
+    if not args.name:
+        # Un motif vide accepte tous les noms
+        return None
+    try:
+        name_pattern = re.compile(args.name, re.IGNORECASE)
+    except re.error as e:
+        print(f"✗ Expression régulière invalide: {e}")
+        sys.exit(1)
+    return lambda attrs: bool(name_pattern.search(attrs['name']))
+
+
+def select_from_args(playlist: Playlist, args,
+                     where: Optional[Callable[[Dict], bool]]) -> List[int]:
+    """Applique les filtres de la ligne de commande"""
+    return playlist.select(
+        group=args.group,
+        group_prefix=args.group_prefix,
+        tvg_id='' if args.no_tvg_id else args.tvg_id,
+        country=args.country,
+        logo_host=args.logo_host,
+        where=where,
+    )
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser):
+    """Ajoute les options de sélection communes"""
+    parser.add_argument("--group", help="Groupe exact")
+    parser.add_argument("--group-prefix", help="Groupes commençant par ce préfixe (ex: 'TR:')")
+    parser.add_argument("--tvg-id", help="TVG ID exact")
+    parser.add_argument("--no-tvg-id", action="store_true", help="Entrées sans tvg-id")
+    parser.add_argument("--country", help="Code pays du nom (ex: TR pour 'TR: ATV')")
+    parser.add_argument("--logo-host", help="Hébergeur du logo (ex: i.imgur.com)")
+    parser.add_argument("--name", help="Expression régulière sur le nom de la chaîne")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(
+        description="Recherche et modification en masse d'un fichier M3U"
+    )
+    parser.add_argument("input_file", help="Chemin du fichier M3U source")
+    parser.add_argument(
+        "-o", "--output",
+        help="Fichier M3U à générer (défaut: <source>_edited.m3u)"
+    )
+    # -o accepté aussi après la sous-commande (SUPPRESS : ne pas écraser
+    # la valeur donnée avant)
+    output_parser = argparse.ArgumentParser(add_help=False)
+    output_parser.add_argument(
+        "-o", "--output", default=argparse.SUPPRESS,
+        help="Fichier M3U à générer (défaut: <source>_edited.m3u)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    select_parser = subparsers.add_parser("select", help="Affiche les entrées sélectionnées")
+    add_filter_arguments(select_parser)
+    select_parser.add_argument("--count", action="store_true", help="Affiche uniquement le nombre")
+    select_parser.add_argument("--limit", type=non_negative_int,
+                               help="Nombre maximum d'entrées affichées")
+
+    set_parser = subparsers.add_parser("set", parents=[output_parser],
+                                       help="Modifie les attributs des entrées sélectionnées")
+    add_filter_arguments(set_parser)
+    set_parser.add_argument("--all", action="store_true",
+                            help="Modifie toutes les entrées (si aucun filtre n'est donné)")
+    set_parser.add_argument(
+        "assignments", nargs="+", metavar="attribut=valeur",
+        help="Attributs à modifier (group-title, tvg-id, tvg-logo, name)"
+    )
+
+    move_parser = subparsers.add_parser("move-group", parents=[output_parser],
+                                        help="Renomme un groupe")
+    move_parser.add_argument("group", help="Groupe source (ou préfixe avec --prefix)")
+    move_parser.add_argument("new_group", help="Nouveau groupe")
+    move_parser.add_argument("--prefix", action="store_true",
+                             help="Déplace tous les groupes commençant par 'group'")
+
+    groups_parser = subparsers.add_parser("groups", help="Liste les valeurs d'un index")
+    groups_parser.add_argument("--index", choices=Playlist.INDEXES, default="group-title",
+                               help="Index à afficher (défaut: group-title)")
+
+    args = parser.parse_args(argv)
+
+    input_file = Path(args.input_file)
+    if not input_file.exists():
+        print(f"✗ Fichier introuvable: {input_file}")
+        sys.exit(1)
+
+    # Valider les arguments avant de charger la playlist
+    where = None
+    if args.command in ("select", "set"):
+        where = name_filter(args)
+    try:
+        if args.command == "set":
+            changes = parse_changes(args.assignments)
+            if not has_filter(args) and not args.all:
+                raise ValueError("Aucun filtre donné : précisez une sélection ou --all "
+                                 "pour modifier toutes les entrées")
+        elif args.command == "move-group":
+            Playlist.check_changes({'group-title': args.new_group})
+            if args.prefix and not args.group:
+                raise ValueError("Préfixe vide : tous les groupes seraient déplacés")
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    playlist = Playlist.load(input_file)
+    print(f"📄 {len(playlist)} entrée(s) chargée(s) depuis: {input_file}", file=sys.stderr)
+
+    if args.command == "select":
+        ids = select_from_args(playlist, args, where)
+        if not args.count:
+            for i in ids[:args.limit]:
+                attrs = playlist.entries[i]
+                print(f"{playlist.line_nums[i]}: [{attrs['group-title']}] "
+                      f"{attrs['name']} → {attrs['tvg-id'] or '-'}")
+        print(f"🔍 {len(ids)} entrée(s) sélectionnée(s)", file=sys.stderr)
+        return
+
+    if args.command == "groups":
+        values = playlist.values(args.index)
+        for key, count in sorted(values.items(), key=lambda item: (-item[1], item[0])):
+            print(f"{count:>8}  {key or '(vide)'}")
+        return
+
+    if args.command == "set":
+        ids = select_from_args(playlist, args, where)
+        modified = playlist.set_attrs(ids, changes)
+        print(f"✓ {modified} entrée(s) modifiée(s) sur {len(ids)} sélectionnée(s)")
+    elif args.command == "move-group":
+        if args.prefix:
+            modified = playlist.move_groups_with_prefix(args.group, args.new_group)
+        else:
+            modified = playlist.move_group(args.group, args.new_group)
+        print(f"✓ {modified} entrée(s) déplacée(s) vers: {args.new_group}")
+
+    if args.output:
+        output_file = Path(args.output)
+    else:
+        output_file = input_file.parent / f"{input_file.stem}_edited{input_file.suffix}"
+    playlist.save(output_file)
+    print(f"✓ Fichier modifié sauvegardé: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests de M3UEditor.parse_extinf / build_extinf
+Lancement depuis la racine du repo: python3 -m unittest (ou python3 -m pytest)
+"""
+
+import unittest
+
+from m3u_editor import M3UEditor
+
+
+class ExtinfTest(unittest.TestCase):
+
+    def assertRoundTrip(self, line: str):
+        attrs = M3UEditor.parse_extinf(line)
+        self.assertEqual(M3UEditor.parse_extinf(M3UEditor.build_extinf(attrs)), attrs)
+
+    def test_parse_known_attributes(self):
+        attrs = M3UEditor.parse_extinf(
+            '#EXTINF:-1 group-title="Turkey" tvg-id="ATV.tr" tvg-logo="http://l/a.png",TR: ATV'
+        )
+        self.assertEqual(attrs, {
+            'group-title': 'Turkey',
+            'tvg-id': 'ATV.tr',
+            'tvg-logo': 'http://l/a.png',
+            'name': 'TR: ATV',
+            'duration': '-1',
+            'extra': '',
+        })
+
+    def test_duration_and_extra_attributes_are_kept(self):
+        line = '#EXTINF:0 tvg-id="a" catchup="default" tvg-name="A",Name'
+        attrs = M3UEditor.parse_extinf(line)
+        self.assertEqual(attrs['duration'], '0')
+        self.assertEqual(attrs['extra'], 'catchup="default" tvg-name="A"')
+        self.assertEqual(M3UEditor.build_extinf(attrs), line)
+
+    def test_name_split_on_first_unquoted_comma(self):
+        attrs = M3UEditor.parse_extinf('#EXTINF:-1 tvg-name="A, B" group-title="G",TR: Foo, HD')
+        self.assertEqual(attrs['name'], 'TR: Foo, HD')
+        self.assertEqual(attrs['group-title'], 'G')
+        self.assertEqual(attrs['extra'], 'tvg-name="A, B"')
+        self.assertRoundTrip('#EXTINF:-1 tvg-name="A, B" group-title="G",TR: Foo, HD')
+
+    def test_unbalanced_quote_falls_back_to_last_comma(self):
+        line = '#EXTINF:5 tvg-x="q" group-title="x,Bad'
+        attrs = M3UEditor.parse_extinf(line)
+        self.assertEqual(attrs['name'], 'Bad')
+        self.assertEqual(attrs['duration'], '5')
+        self.assertEqual(attrs['group-title'], '')
+        self.assertEqual(M3UEditor.build_extinf(attrs), line)
+
+    def test_prefixed_attribute_names_are_not_known_attributes(self):
+        attrs = M3UEditor.parse_extinf('#EXTINF:-1 x-group-title="Q" group-title="G",N')
+        self.assertEqual(attrs['group-title'], 'G')
+        self.assertEqual(attrs['extra'], 'x-group-title="Q"')
+        self.assertEqual(M3UEditor.build_extinf(attrs),
+                         '#EXTINF:-1 group-title="G" x-group-title="Q",N')
+        self.assertRoundTrip('#EXTINF:-1 x-group-title="Q" group-title="G",N')
+        self.assertRoundTrip('#EXTINF:-1 my-tvg-id="1" tvg-logo-url="u" tvg-id="2",N')
+
+    def test_without_attributes(self):
+        attrs = M3UEditor.parse_extinf('#EXTINF:-1,Sans attributs')
+        self.assertEqual(attrs['name'], 'Sans attributs')
+        self.assertEqual(M3UEditor.build_extinf(attrs), '#EXTINF:-1,Sans attributs')
+
+    def test_missing_name_is_rejected(self):
+        self.assertIsNone(M3UEditor.parse_extinf('#EXTINF:-1 group-title="G"'))
+
+    def test_build_without_optional_keys(self):
+        attrs = {'group-title': 'G', 'tvg-id': '', 'tvg-logo': '', 'name': 'N'}
+        self.assertEqual(M3UEditor.build_extinf(attrs), '#EXTINF:-1 group-title="G",N')
+
+
+if __name__ == '__main__':
+    unittest.main()
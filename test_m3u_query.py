@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Tests de m3u_query.Playlist
+Lancement depuis la racine du repo: python3 -m unittest (ou python3 -m pytest)
+"""
+
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from m3u_editor import M3UEditor
+from m3u_query import Playlist, main, parse_changes
+
+
+SAMPLE = (
+    '#EXTM3U\n'
+    '#EXTINF:-1 tvg-name="X1" group-title="TR: Kids" tvg-id="kids.tr" '
+    'tvg-logo="https://i.imgur.com/a.png",TR: Foo, HD\n'
+    'http://stream/1\n'
+    '#EXTINF:0 tvg-id="" catchup="default" group-title="TR: News",TR: Haber\n'
+    '#EXTVLCOPT:http-user-agent=VLC\n'
+    'http://stream/2\n'
+    '#EXTINF:-1 group-title="TR: News" tvg-logo="https://logos.example.org/b.png",TR: ATV\n'
+    'http://stream/3\n'
+    '#EXTINF:-1  group-title="FR: Cinema"   tvg-id="ciné.fr",FR: Ciné+\n'
+    'http://stream/4\n'
+    '#EXTINF:-1,Sans attributs\n'
+    'http://stream/5\n'
+)
+
+
+class PlaylistTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / 'sample.m3u'
+        self.path.write_text(SAMPLE, encoding='utf-8')
+        self.playlist = Playlist.load(self.path)
+
+    def assertIndexesConsistent(self):
+        """Chaque entrée est rangée sous sa clé actuelle, et uniquement celle-là"""
+        playlist = self.playlist
+        for name in Playlist.INDEXES:
+            for i, attrs in enumerate(playlist.entries):
+                keys = [key for key, bucket in playlist._index[name].items()
+                        if i in Playlist._ids(bucket)]
+                self.assertEqual(keys, [playlist._key(attrs, name)], f"{name} / entrée {i}")
+
+    def test_load(self):
+        self.assertEqual(len(self.playlist), 5)
+        self.assertEqual(self.playlist.header, ['#EXTM3U\n'])
+        self.assertEqual(self.playlist.bodies[1],
+                         ['#EXTVLCOPT:http-user-agent=VLC\n', 'http://stream/2\n'])
+        self.assertEqual(self.playlist.entries[0]['name'], 'TR: Foo, HD')
+        self.assertIndexesConsistent()
+
+    def test_indexes(self):
+        self.assertEqual(self.playlist.values('country'), {'TR': 3, 'FR': 1, '': 1})
+        self.assertEqual(self.playlist.values('logo-host'),
+                         {'i.imgur.com': 1, 'logos.example.org': 1, '': 3})
+
+    def test_select_intersection(self):
+        self.assertEqual(self.playlist.select(group='TR: News', tvg_id=''), [1, 2])
+        self.assertEqual(self.playlist.select(group_prefix='TR:', logo_host='logos.example.org'), [2])
+        self.assertEqual(self.playlist.select(country='TR', tvg_id='', logo_host=''), [1])
+        self.assertEqual(self.playlist.select(country='FR', group='TR: News'), [])
+        self.assertEqual(
+            self.playlist.select(group_prefix='TR:',
+                                 where=lambda attrs: 'a' in attrs['name'].lower()),
+            [1, 2]
+        )
+        self.assertEqual(self.playlist.select(), [0, 1, 2, 3, 4])
+
+    def test_set_attrs(self):
+        ids = self.playlist.select(group='TR: News')
+        self.assertEqual(self.playlist.set_attrs(ids, {'tvg-id': 'news.tr'}), 2)
+        self.assertEqual(self.playlist.set_attrs(ids, {'tvg-id': 'news.tr'}), 0)
+        self.assertEqual(self.playlist.select(tvg_id='news.tr'), [1, 2])
+        self.assertIndexesConsistent()
+
+        self.playlist.set_attrs([0, 3], {'tvg-logo': 'https://logos.example.org/c.png',
+                                         'name': 'DE: Kanal'})
+        self.assertEqual(self.playlist.select(logo_host='logos.example.org'), [0, 2, 3])
+        self.assertEqual(self.playlist.select(country='DE'), [0, 3])
+        self.assertIndexesConsistent()
+
+        self.playlist.set_attrs(self.playlist.select(), {'group-title': 'Tout'})
+        self.assertEqual(self.playlist.values('group-title'), {'Tout': 5})
+        self.assertIndexesConsistent()
+
+    def test_set_attrs_index_strategies(self):
+        # 200 entrées, 4 groupes, tvg-id uniques : couvre les trois stratégies
+        # de _discard (clé par clé, entrée par entrée, reconstruction)
+        lines = ['#EXTM3U\n']
+        for i in range(200):
+            lines.append(f'#EXTINF:-1 group-title="G{i % 4}" tvg-id="id{i}",TR: C{i}\n')
+            lines.append(f'http://stream/{i}\n')
+        self.path.write_text(''.join(lines), encoding='utf-8')
+        self.playlist = Playlist.load(self.path)
+
+        self.playlist.set_attrs(range(0, 120), {'group-title': 'Tout'})
+        self.assertEqual(self.playlist.values('group-title'),
+                         {'Tout': 120, 'G0': 20, 'G1': 20, 'G2': 20, 'G3': 20})
+        self.assertIndexesConsistent()
+
+        self.playlist.set_attrs(range(0, 50), {'tvg-id': 'a'})
+        self.assertEqual(self.playlist.values('tvg-id')['a'], 50)
+        self.assertIndexesConsistent()
+
+        self.playlist.set_attrs(range(30, 200), {'tvg-id': 'b'})
+        self.assertEqual(self.playlist.values('tvg-id'), {'a': 30, 'b': 170})
+        self.assertIndexesConsistent()
+
+        self.playlist.set_attrs(range(200), {'name': 'FR: X'})
+        self.assertEqual(self.playlist.values('country'), {'FR': 200})
+        self.assertIndexesConsistent()
+
+    def test_set_attrs_rejects_invalid_values(self):
+        with self.assertRaises(ValueError):
+            self.playlist.set_attrs([0], {'group-title': 'a"b'})
+        with self.assertRaises(ValueError):
+            self.playlist.set_attrs([0], {'name': 'a\nb'})
+        with self.assertRaises(ValueError):
+            self.playlist.set_attrs([0], {'tvg-name': 'x'})
+        self.assertFalse(self.playlist.dirty)
+
+    def test_move_group(self):
+        self.assertEqual(self.playlist.move_groups_with_prefix('TR:', 'Turkey'), 3)
+        self.assertEqual(self.playlist.select(group='Turkey'), [0, 1, 2])
+        self.assertIndexesConsistent()
+
+        self.assertEqual(self.playlist.move_group('FR: Cinema', 'Turkey'), 1)
+        self.assertEqual(self.playlist.move_group('Inconnu', 'Turkey'), 0)
+        self.assertEqual(self.playlist.values('group-title'), {'Turkey': 4, '': 1})
+        self.assertIndexesConsistent()
+
+    def test_lines_unchanged(self):
+        self.assertEqual(''.join(self.playlist.lines()), SAMPLE)
+
+    def test_lines_keep_untouched_entries(self):
+        self.playlist.move_group('TR: News', 'Turkey')
+        lines = self.playlist.lines()
+        original = SAMPLE.splitlines(keepends=True)
+        for i in (0, 3, 4):
+            line_num = self.playlist.line_nums[i]
+            self.assertEqual(lines[line_num - 1], original[line_num - 1])
+
+        self.assertEqual(
+            lines[3],
+            '#EXTINF:0 group-title="Turkey" catchup="default",TR: Haber\n'
+        )
+
+    def test_rebuilt_line_keeps_extra_attributes(self):
+        self.playlist.set_attrs([0], {'group-title': 'Turkey'})
+        rebuilt = self.playlist.lines()[1]
+        self.assertEqual(
+            rebuilt,
+            '#EXTINF:-1 group-title="Turkey" tvg-id="kids.tr" '
+            'tvg-logo="https://i.imgur.com/a.png" tvg-name="X1",TR: Foo, HD\n'
+        )
+        self.assertEqual(M3UEditor.parse_extinf(rebuilt.strip()),
+                         self.playlist.entries[0])
+
+    def test_save_roundtrip(self):
+        self.playlist.move_groups_with_prefix('TR:', 'Turkey')
+        output = self.path.with_name('sample_edited.m3u')
+        self.playlist.save(output)
+
+        reloaded = Playlist.load(output)
+        self.assertEqual(reloaded.entries, self.playlist.entries)
+        self.assertEqual(reloaded.bodies, self.playlist.bodies)
+
+
+class QueryCliTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / 'sample.m3u'
+        self.path.write_text(SAMPLE, encoding='utf-8')
+        self.output = Path(tmp_dir.name) / 'out.m3u'
+
+    def run_cli(self, *args: str) -> str:
+        """Lance main() et retourne la sortie standard"""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            main([str(self.path), *args])
+        return stdout.getvalue()
+
+    def assertCliError(self, *args: str, code: int = 1) -> str:
+        """Vérifie que main() s'arrête en erreur sans écrire de fichier"""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as ctx:
+                main([str(self.path), *args])
+        self.assertEqual(ctx.exception.code, code)
+        self.assertFalse(self.output.exists())
+        return stdout.getvalue()
+
+    def test_set_requires_filter_or_all(self):
+        output = self.assertCliError('set', 'tvg-logo=', '-o', str(self.output))
+        self.assertIn('--all', output)
+        # Un motif ou préfixe vide sélectionne tout : ce n'est pas un filtre
+        self.assertCliError('set', '--name', '', 'tvg-id=x', '-o', str(self.output))
+        self.assertCliError('set', '--group-prefix', '', 'tvg-id=x', '-o', str(self.output))
+
+        self.run_cli('set', '--all', 'tvg-id=x', '-o', str(self.output))
+        self.assertEqual(Playlist.load(self.output).values('tvg-id'), {'x': 5})
+
+    def test_set_with_filter(self):
+        self.run_cli('set', '--group-prefix', 'TR:', '--no-tvg-id', 'tvg-id=tr',
+                     '-o', str(self.output))
+        playlist = Playlist.load(self.output)
+        self.assertEqual(playlist.select(tvg_id='tr'), [1, 2])
+
+    def test_invalid_name_regex(self):
+        output = self.assertCliError('select', '--name', '(')
+        self.assertIn('Expression régulière invalide', output)
+        self.assertCliError('set', '--name', '(', 'tvg-id=x', '-o', str(self.output))
+
+    def test_invalid_assignments(self):
+        self.assertIn('Format invalide',
+                      self.assertCliError('set', '--all', 'tvg-id', '-o', str(self.output)))
+        self.assertIn('Guillemet',
+                      self.assertCliError('set', '--all', 'group-title=a"b', '-o', str(self.output)))
+        self.assertIn('inconnu',
+                      self.assertCliError('set', '--all', 'tvg-name=x', '-o', str(self.output)))
+
+    def test_parse_changes(self):
+        self.assertEqual(parse_changes(['group-title=A=B', 'name=TR: X, HD']),
+                         {'group-title': 'A=B', 'name': 'TR: X, HD'})
+        with self.assertRaises(ValueError):
+            parse_changes(['name=a\nb'])
+
+    def test_output_option_after_subcommand(self):
+        self.run_cli('move-group', '--prefix', 'TR:', 'Turkey', '-o', str(self.output))
+        self.assertEqual(Playlist.load(self.output).values('group-title'),
+                         {'Turkey': 3, 'FR: Cinema': 1, '': 1})
+
+    def test_move_group_rejects_empty_prefix(self):
+        self.assertCliError('move-group', '--prefix', '', 'Turkey', '-o', str(self.output))
+
+    def test_select_limit(self):
+        self.assertEqual(len(self.run_cli('select', '--limit', '2').splitlines()), 2)
+        self.assertCliError('select', '--limit', '-1', code=2)
+
+
+if __name__ == '__main__':
+    unittest.main()